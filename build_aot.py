@@ -0,0 +1,27 @@
+"""
+Compilação antecipada (AOT) do núcleo da heurística gulosa
+
+Gera o módulo de extensão `onco_fast` com a função `greedy_core`, que
+otimizacao_onco_simplex.py importa na inicialização. Assim a primeira
+chamada não paga o tempo de compilação JIT do Numba.
+
+USO (uma única vez, no diretório do projeto):
+    pip install numba
+    python build_aot.py
+
+Sem a extensão, o script continua funcionando (JIT do Numba ou Python puro).
+"""
+
+from numba.pycc import CC
+
+from nucleo_guloso import greedy_core
+
+cc = CC('onco_fast')
+
+# (custos, tempos, utis, orçamento, horas, leitos) -> (posições, quantidades)
+cc.export('greedy_core', 'UniTuple(i8[::1], 2)(f8[::1], f8[::1], f8[::1], f8, f8, f8)')(greedy_core)
+
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"✅ Extensão compilada: {cc.output_file}")
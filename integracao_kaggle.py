@@ -3,74 +3,132 @@ Script de Integração com Onco-360 (Kaggle)
 Demonstra como carregar dados reais e aplicar otimização
 
 REQUISITOS:
-1. pip install kagglehub pandas numpy pulp
+1. pip install kagglehub pandas numpy pulp pyarrow
 2. Configurar Kaggle API (opcional)
    - Criar conta no Kaggle
    - Baixar kaggle.json de https://www.kaggle.com/settings
    - Colocar em ~/.kaggle/kaggle.json
 """
 
+import os
+import shutil
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 from pulp import *
 
-print("=" * 90)
-print(" INTEGRAÇÃO COM DADOS REAIS DO ONCO-360 ")
-print("=" * 90)
+from nucleo_guloso import emitir
+
+# Cópia local do parquet: evita novo download (e verificação) a cada execução
+CACHE_PARQUET = Path.home() / ".cache" / "onco360" / "raw_painel_de_oncologia.parquet"
 
-print("\n📥 Baixando dataset Onco-360...")
+emitir([
+    "=" * 90,
+    " INTEGRAÇÃO COM DADOS REAIS DO ONCO-360 ",
+    "=" * 90
+])
 
-try:
-    import kagglehub
-    path = kagglehub.dataset_download("rafatrindade/onco-360")
-    print(f"✅ Download concluído: {path}")
-except ImportError:
-    print("❌ kagglehub não instalado. Execute: pip install kagglehub")
-    path = None
-except Exception as e:
-    print(f"❌ Erro no download: {e}")
-    path = None
+path = None
+if CACHE_PARQUET.exists():
+    try:
+        import pyarrow.parquet as pq
+        # Lê apenas o rodapé: cópia truncada ou corrompida falha aqui
+        pq.ParquetFile(CACHE_PARQUET)
+        path = str(CACHE_PARQUET.parent)
+        emitir([f"\n✅ Usando cópia local: {CACHE_PARQUET}"])
+    except ImportError:
+        path = str(CACHE_PARQUET.parent)
+    except (OSError, ValueError) as e:
+        emitir([f"\n⚠️  Cópia local inválida, descartada: {e}"])
+        CACHE_PARQUET.unlink(missing_ok=True)
+
+if path is None:
+    emitir(["\n📥 Baixando dataset Onco-360..."])
+    
+    try:
+        import kagglehub
+        path = kagglehub.dataset_download("rafatrindade/onco-360")
+        emitir([f"✅ Download concluído: {path}"])
+    except ImportError:
+        emitir(["❌ kagglehub não instalado. Execute: pip install kagglehub"])
+        path = None
+    except Exception as e:
+        emitir([f"❌ Erro no download: {e}"])
+        path = None
+    
+    if path:
+        # Cópia em arquivo temporário e troca atômica: uma cópia interrompida
+        # nunca fica no lugar do cache
+        temporario = CACHE_PARQUET.with_suffix(".parquet.tmp")
+        try:
+            CACHE_PARQUET.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(f"{path}/raw_painel_de_oncologia.parquet", temporario)
+            os.replace(temporario, CACHE_PARQUET)
+        except OSError as e:
+            temporario.unlink(missing_ok=True)
+            emitir([f"⚠️  Não foi possível salvar a cópia local: {e}"])
 
 if path:
-    print("\n📊 Carregando dados do Painel de Oncologia...")
+    emitir(["\n📊 Carregando dados do Painel de Oncologia..."])
     
+    buf = []
     try:
-        # Carregar base principal
-        df_painel = pd.read_parquet(f"{path}/raw_painel_de_oncologia.parquet")
+        import pyarrow.parquet as pq
         
-        print(f"✅ Dados carregados: {len(df_painel):,} registros")
-        print(f"\n🔍 Colunas disponíveis:")
-        print(df_painel.columns.tolist())
-        
-        print(f"\n📈 Primeiras linhas:")
-        print(df_painel.head())
-        
-        # Análise exploratória
-        print(f"\n🔬 ANÁLISE EXPLORATÓRIA")
-        print(f"=" * 90)
+        arquivo = f"{path}/raw_painel_de_oncologia.parquet"
+        colunas_disponiveis = pq.ParquetFile(arquivo).schema_arrow.names
         
         colunas_interesse = [
             'procedimento', 'tipo_cirurgia', 'tempo_medio', 'custo',
             'complexidade', 'gravidade', 'uf', 'estabelecimento'
         ]
         
+        # Parquet é colunar: ler apenas as colunas usadas adiante
+        colunas_leitura = [col for col in dict.fromkeys(['uf', 'UF'] + colunas_interesse)
+                           if col in colunas_disponiveis]
+        
+        # Carregar base principal
+        df_painel = pd.read_parquet(arquivo, columns=colunas_leitura,
+                                    engine='pyarrow', dtype_backend='pyarrow')
+        
+        # UF tem poucos valores distintos: categórico permite filtrar por código
+        for col in ('uf', 'UF'):
+            if col in df_painel.columns:
+                df_painel[col] = df_painel[col].astype('category')
+        
+        buf.append(f"✅ Dados carregados: {len(df_painel):,} registros")
+        buf.append(f"\n🔍 Colunas disponíveis:")
+        buf.append(str(colunas_disponiveis))
+        
+        buf.append(f"\n📈 Primeiras linhas:")
+        buf.append(str(df_painel.head()))
+        
+        # Análise exploratória
+        buf.append(f"\n🔬 ANÁLISE EXPLORATÓRIA")
+        buf.append(f"=" * 90)
+        
         colunas_encontradas = [col for col in colunas_interesse 
                                if col in df_painel.columns]
         
-        print(f"\nColunas de interesse encontradas: {colunas_encontradas}")
+        buf.append(f"\nColunas de interesse encontradas: {colunas_encontradas}")
         
         # Filtrar dados de Pernambuco
         if 'uf' in df_painel.columns or 'UF' in df_painel.columns:
             col_uf = 'uf' if 'uf' in df_painel.columns else 'UF'
-            df_pe = df_painel[df_painel[col_uf].isin(['PE', 26])]
-            print(f"\n📍 Registros de Pernambuco: {len(df_pe):,}")
+            categorias = df_painel[col_uf].cat.categories
+            codigos_pe = [categorias.get_loc(v) for v in ('PE', 26) if v in categorias]
+            codigos = df_painel[col_uf].cat.codes.to_numpy()
+            df_pe = df_painel[np.isin(codigos, codigos_pe)]
+            buf.append(f"\n📍 Registros de Pernambuco: {len(df_pe):,}")
         else:
             df_pe = df_painel
-            print("\n⚠️  Coluna UF não encontrada, usando dados gerais")
-        
+            buf.append("\n⚠️  Coluna UF não encontrada, usando dados gerais")
         
-        print(f"\n🔧 Preparando dados para otimização...")
         
+        buf.append(f"\n🔧 Preparando dados para otimização...")
+        emitir(buf)
 
     except Exception as e:
-        print(f"❌ Erro ao processar dados: {e}")
+        buf.append(f"❌ Erro ao processar dados: {e}")
+        emitir(buf)
@@ -0,0 +1,80 @@
+"""
+Núcleo numérico compartilhado pelos scripts de otimização
+
+`greedy_core` (heurística gulosa de otimizacao_onco_simplex.py) é mantido
+em módulo próprio para ser compilado de duas formas:
+- antecipadamente (AOT) por build_aot.py, gerando a extensão `onco_fast`;
+- em tempo de execução (JIT) pelo Numba, quando a extensão não existe.
+
+`como_arrays`, `calcular_pesos` e `emitir` são compartilhados pelos demais
+scripts.
+"""
+
+import sys
+
+import numpy as np
+
+
+def emitir(linhas):
+    """
+    Escreve um bloco de linhas de uma só vez na saída padrão
+    """
+    sys.stdout.write("\n".join(linhas) + "\n")
+
+
+def como_arrays(procedimentos):
+    """
+    Colunas da tabela como arrays NumPy (estrutura de arrays); o DataFrame
+    só é montado na exibição
+    """
+    return {k: np.asarray(v) for k, v in procedimentos.items()}
+
+
+def calcular_pesos(data, criterio):
+    """
+    Vetor de pesos da função objetivo para o critério informado
+    """
+    if criterio == 'gravidade':
+        return data['gravidade'].astype(np.float64)
+    elif criterio == 'incidencia':
+        return data['incidencia_pe'].astype(np.float64)
+    else:  # custo_beneficio
+        # Aritmética direto nos arrays (sem Series intermediárias nem alinhamento)
+        cb = np.divide(data['gravidade'].astype(np.float64), data['custo_r'].astype(np.float64))
+        cb *= 10000
+        return cb
+
+
+def greedy_core(c, t, u, B, H, U):
+    """
+    Recebe apenas arrays float64 já ordenados por peso (maior primeiro) e
+    devolve as posições escolhidas e as respectivas quantidades (int64)
+    """
+    n = c.shape[0]
+    idx = np.empty(n, dtype=np.int64)
+    qty = np.empty(n, dtype=np.int64)
+    m = 0
+    orcamento_usado = 0.0
+    tempo_usado = 0.0
+    uti_usada = 0.0
+
+    for k in range(n):
+        # Calcular quantos deste procedimento cabem nos recursos disponíveis
+        max_por_orcamento = (B - orcamento_usado) // c[k]
+        max_por_tempo = (H - tempo_usado) / t[k]
+        max_por_uti = (U - uti_usada) // u[k] if u[k] > 0 else np.inf
+
+        # Quantidade máxima que pode ser feita
+        qtd_max = int(min(max_por_orcamento, max_por_tempo, max_por_uti))
+
+        if qtd_max > 0:
+            idx[m] = k
+            qty[m] = qtd_max
+            m += 1
+
+            # Atualizar recursos usados
+            orcamento_usado += qtd_max * c[k]
+            tempo_usado += qtd_max * t[k]
+            uti_usada += qtd_max * u[k]
+
+    return idx[:m], qty[:m]
@@ -1,11 +1,19 @@
 
+import os
+from collections import namedtuple
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
 from pulp import *
 
-print("=" * 90)
-print(" OTIMIZAÇÃO DE CIRURGIAS ONCOLÓGICAS - MÉTODO SIMPLEX (PuLP) ")
-print("=" * 90)
+from nucleo_guloso import calcular_pesos, como_arrays, emitir
+
+try:
+    from scipy.optimize import milp, LinearConstraint, Bounds
+except ImportError:  # scipy é opcional: sem ele usa-se apenas o CBC
+    milp = None
+
 
 procedimentos = {
     'id': ['P1', 'P2', 'P3', 'P4', 'P5', 'P6', 'P7', 'P8'],
@@ -26,105 +34,216 @@ procedimentos = {
     'incidencia_pe': [3.62, 10.01, 13.71, 7.36, 3.09, 5.20, 4.80, 6.15]
 }
 
-df = pd.DataFrame(procedimentos)
+data = como_arrays(procedimentos)
+
+
+def criar_solver(time_limit=60):
+    """
+    Seleciona o solver CBC disponível, preferindo a chamada em memória
+    (COINMP_DLL) à execução via linha de comando
+    """
+    threads = os.cpu_count() or 1
+    opcoes = ["preprocess on", "cuts on"]
+    candidatos = [
+        lambda: COINMP_DLL(msg=0, timeLimit=time_limit),
+        lambda: PULP_CBC_CMD(msg=0, threads=threads, timeLimit=time_limit, options=opcoes),
+        lambda: COIN_CMD(msg=0, threads=threads, timeLimit=time_limit, options=opcoes),
+    ]
+    for candidato in candidatos:
+        try:
+            solver = candidato()
+            if solver.available():
+                return solver
+        except (PulpSolverError, OSError):
+            continue
+    return PULP_CBC_CMD(msg=0)
 
-print("\n📊 PROCEDIMENTOS ONCOLÓGICOS:")
-print(df.to_string(index=False))
 
+# Limite usado quando nenhum recurso restringe x_i (coeficientes todos nulos)
+SEM_LIMITE = 10**9
 
-def otimizar_cirurgias_pulp(df, orcamento, horas_sala, leitos_uti, criterio='incidencia'):
+
+def limites_superiores(custo, tempo, uti, orcamento, horas_sala, leitos_uti):
     """
-    Resolve o problema usando PuLP (Simplex com Branch and Bound)
+    Limite superior de cada x_i imposto por cada recurso isoladamente
+    (x_i <= orcamento / custo_i, horas_sala / tempo_i, leitos_uti / uti_i)
     
-    Garante solução ÓTIMA GLOBAL
+    Recursos com coeficiente nulo não limitam x_i; os limites nunca excluem
+    uma solução viável
+    """
+    ub = np.full(len(custo), float(SEM_LIMITE))
+    for coef, capacidade in ((custo, orcamento), (tempo, horas_sala), (uti, leitos_uti)):
+        usa = coef > 0
+        ub[usa] = np.minimum(ub[usa], np.floor(capacidade / coef[usa] + 1e-9))
+    # Capacidade negativa: só x_i = 0 resta (o modelo fica inviável)
+    return np.maximum(ub, 0).astype(np.int64)
+
+
+def resolver_highs(w, custo, tempo, uti, orcamento, horas_sala, leitos_uti):
     """
+    Resolve o modelo com o HiGHS (scipy.optimize.milp), sem subprocesso
+    nem arquivo MPS intermediário
     
-    print(f"\n{'=' * 90}")
-    print(f"OTIMIZANDO COM PULP - Critério: {criterio.upper()}")
-    print(f"{'=' * 90}")
+    Retorna (status, quantidades, valor_objetivo), no formato de
+    resolver_cbc, ou None se o scipy não estiver disponível ou o HiGHS
+    falhar sem concluir (limite de tempo, erro numérico)
+    """
+    if milp is None:
+        return None
     
+    ub = limites_superiores(custo, tempo, uti, orcamento, horas_sala, leitos_uti)
+    A = np.vstack([custo, tempo, uti]).astype(np.float64)
+    b = np.array([orcamento, horas_sala, leitos_uti], dtype=np.float64)
+    res = milp(
+        c=-w,
+        constraints=LinearConstraint(A, -np.inf, b),
+        integrality=np.ones(len(w)),
+        bounds=Bounds(0, ub)
+    )
+    if res.status == 2:  # inviável: o CBC chegaria à mesma conclusão
+        return 'Infeasible', None, None
+    if not res.success:
+        return None
+    return 'Optimal', np.rint(res.x).astype(np.int64), -res.fun
+
 
+def resolver_cbc(w, custo, tempo, uti, orcamento, horas_sala, leitos_uti):
+    """
+    Resolve o modelo com PuLP + CBC
+    
+    Retorna (status, quantidades, valor_objetivo)
+    """
     prob = LpProblem("Cirurgias_Oncologicas", LpMaximize)
     
     # Variáveis de decisão (inteiras)
-    n = len(df)
-    x = [LpVariable(f"x_{i}", lowBound=0, cat='Integer') for i in range(n)]
-    
-    # Pesos para função objetivo
-    if criterio == 'gravidade':
-        w = df['gravidade'].values
-    elif criterio == 'incidencia':
-        w = df['incidencia_pe'].values
-    else:  # custo_beneficio
-        w = (df['gravidade'] / df['custo_r'] * 10000).values
+    n = len(w)
+    ub = limites_superiores(custo, tempo, uti, orcamento, horas_sala, leitos_uti)
+    x = [LpVariable(f"x_{i}", lowBound=0, upBound=int(ub[i]), cat='Integer') for i in range(n)]
     
     # FUNÇÃO OBJETIVO
-    prob += lpSum([w[i] * x[i] for i in range(n)]), "Valor_Total"
+    prob += LpAffineExpression(list(zip(x, w.tolist()))), "Valor_Total"
     
     # RESTRIÇÕES
     # 1. Orçamento
-    prob += lpSum([df['custo_r'].iloc[i] * x[i] for i in range(n)]) <= orcamento, "Orcamento"
+    prob += LpAffineExpression(list(zip(x, custo.tolist()))) <= orcamento, "Orcamento"
     
     # 2. Tempo de sala
-    prob += lpSum([df['tempo_h'].iloc[i] * x[i] for i in range(n)]) <= horas_sala, "Tempo"
+    prob += LpAffineExpression(list(zip(x, tempo.tolist()))) <= horas_sala, "Tempo"
     
     # 3. Leitos UTI
-    prob += lpSum([df['uti'].iloc[i] * x[i] for i in range(n)]) <= leitos_uti, "UTI"
+    prob += LpAffineExpression(list(zip(x, uti.tolist()))) <= leitos_uti, "UTI"
     
-    # Resolver
-    print("⚙️  Executando Simplex...")
-    prob.solve(PULP_CBC_CMD(msg=0))
+    prob.solve(criar_solver())
     
-    # Verificar status
     status = LpStatus[prob.status]
-    print(f"Status: {status}")
+    if status != 'Optimal':
+        return status, None, None
+    qtds = np.rint(np.fromiter((xi.varValue for xi in x), count=n, dtype=np.float64)).astype(np.int64)
+    return status, qtds, value(prob.objective)
+
+
+# Resultados imutáveis: são compartilhados entre chamadas pelo cache
+Resultado = namedtuple('Resultado', ['status', 'solver', 'saida', 'solucao', 'metricas'])
+Metricas = namedtuple('Metricas', ['total_cirurgias', 'total_tempo', 'total_custo',
+                                   'total_uti', 'valor_objetivo'])
+# Uma linha da solução; pd.DataFrame(resultado.solucao) recompõe a tabela
+Linha = namedtuple('Linha', ['id', 'procedimento', 'quantidade', 'tempo_total_h',
+                             'custo_total_r', 'leitos_uti'])
+
+
+@lru_cache(maxsize=128)
+def otimizar_cirurgias_pulp(orcamento, horas_sala, leitos_uti, criterio='incidencia'):
+    """
+    Resolve o problema com HiGHS (scipy) ou, na falta dele, PuLP + CBC
+    (Simplex com Branch and Bound)
+    
+    Garante solução ÓTIMA GLOBAL
+    
+    Opera sobre a tabela fixa `data`; resultados são memorizados por
+    (orcamento, horas_sala, leitos_uti, criterio). A `solucao` é uma tupla
+    de `Linha`, e não um DataFrame, para que o resultado compartilhado pelo
+    cache não possa ser alterado
+    """
+    
+    buf = []
+    buf.append(f"\n{'=' * 90}")
+    buf.append(f"OTIMIZANDO - Critério: {criterio.upper()}")
+    buf.append(f"{'=' * 90}")
+    
+
+    # Coeficientes extraídos uma única vez (evita .iloc por termo)
+    custo = data['custo_r']
+    tempo = data['tempo_h'].astype(np.float64)
+    uti = data['uti']
+    
+    # Pesos para função objetivo
+    w = calcular_pesos(data, criterio)
+    
+    # Resolver (HiGHS em memória; CBC via PuLP como alternativa)
+    buf.append("⚙️  Executando Simplex...")
+    resultado = resolver_highs(w, custo, tempo, uti, orcamento, horas_sala, leitos_uti)
+    if resultado is not None:
+        solver = 'SciPy + HiGHS'
+        status, qtds, valor_obj = resultado
+    else:
+        solver = 'PuLP + CBC'
+        status, qtds, valor_obj = resolver_cbc(w, custo, tempo, uti, orcamento, horas_sala, leitos_uti)
+    buf.append(f"Solver: {solver}")
+    
+    # Verificar status
+    buf.append(f"Status: {status}")
     
     if status == 'Optimal':
-        # Extrair solução
-        solucao = []
-        for i in range(n):
-            qtd = int(x[i].varValue())
-            if qtd > 0:
-                solucao.append({
-                    'ID': df['id'].iloc[i],
-                    'Procedimento': df['procedimento'].iloc[i],
-                    'Quantidade': qtd,
-                    'Tempo_Total_h': qtd * df['tempo_h'].iloc[i],
-                    'Custo_Total_R$': qtd * df['custo_r'].iloc[i],
-                    'Leitos_UTI': qtd * df['uti'].iloc[i]
-                })
+        # Extrair solução (vetorizado sobre os procedimentos escolhidos)
+        mask = qtds > 0
+        qtd = qtds[mask]
+        tempo_total = qtd * data['tempo_h'][mask]
+        custo_total = qtd * data['custo_r'][mask]
+        uti_total = qtd * data['uti'][mask]
         
-        df_sol = pd.DataFrame(solucao)
+        df_sol = pd.DataFrame({
+            'ID': data['id'][mask],
+            'Procedimento': data['procedimento'][mask],
+            'Quantidade': qtd,
+            'Tempo_Total_h': tempo_total,
+            'Custo_Total_R$': custo_total,
+            'Leitos_UTI': uti_total
+        })
         
-        total_cirurgias = df_sol['Quantidade'].sum()
-        total_tempo = df_sol['Tempo_Total_h'].sum()
-        total_custo = df_sol['Custo_Total_R$'].sum()
-        total_uti = df_sol['Leitos_UTI'].sum()
-        valor_obj = value(prob.objective)
+        total_cirurgias = qtd.sum()
+        total_tempo = tempo_total.sum()
+        total_custo = custo_total.sum()
+        total_uti = uti_total.sum()
         
-        print("\n📊 SOLUÇÃO ÓTIMA:")
-        print(df_sol.to_string(index=False))
-        print(f"\n📈 TOTAIS:")
-        print(f"  Cirurgias: {total_cirurgias}")
-        print(f"  Tempo: {total_tempo:.1f}h / {horas_sala}h")
-        print(f"  Custo: R$ {total_custo:,.2f} / R$ {orcamento:,.2f}")
-        print(f"  UTI: {total_uti} / {leitos_uti}")
-        print(f"  Valor Objetivo: {valor_obj:.2f}")
+        buf.append("\n📊 SOLUÇÃO ÓTIMA:")
+        buf.append(df_sol.to_string(index=False))
+        buf.append(f"\n📈 TOTAIS:")
+        buf.append(f"  Cirurgias: {total_cirurgias}")
+        buf.append(f"  Tempo: {total_tempo:.1f}h / {horas_sala}h")
+        buf.append(f"  Custo: R$ {total_custo:,.2f} / R$ {orcamento:,.2f}")
+        buf.append(f"  UTI: {total_uti} / {leitos_uti}")
+        buf.append(f"  Valor Objetivo: {valor_obj:.2f}")
         
-        return {
-            'status': status,
-            'solucao': df_sol,
-            'metricas': {
-                'total_cirurgias': total_cirurgias,
-                'total_tempo': total_tempo,
-                'total_custo': total_custo,
-                'total_uti': total_uti,
-                'valor_objetivo': valor_obj
-            }
-        }
+        return Resultado(
+            status=status,
+            solver=solver,
+            saida=tuple(buf),
+            solucao=tuple(map(Linha._make, zip(
+                data['id'][mask].tolist(), data['procedimento'][mask].tolist(),
+                qtd.tolist(), tempo_total.tolist(), custo_total.tolist(), uti_total.tolist()
+            ))),
+            metricas=Metricas(
+                total_cirurgias=total_cirurgias,
+                total_tempo=total_tempo,
+                total_custo=total_custo,
+                total_uti=total_uti,
+                valor_objetivo=valor_obj
+            )
+        )
     else:
-        print(f"❌ Solução não encontrada: {status}")
-        return {'status': status, 'solucao': None, 'metricas': None}
+        buf.append(f"❌ Solução não encontrada: {status}")
+        return Resultado(status=status, solver=solver, saida=tuple(buf), solucao=None, metricas=None)
+
 cenarios = {
     'REAL': {
         'orcamento': 500000,
@@ -147,25 +266,52 @@ cenarios = {
 }
 
 
-print("\n" + "=" * 90)
-print(" RESULTADOS ")
-print("=" * 90)
-
-for nome, config in cenarios.items():
-    print(f"\n🏥 CENÁRIO {nome}")
+def _resolver_cenario(item):
+    """
+    Resolve um cenário (nome, configuração)
+    """
+    nome, config = item
     resultado = otimizar_cirurgias_pulp(
-        df,
         config['orcamento'],
         config['horas_sala'],
         config['leitos_uti'],
         config['criterio']
     )
+    return nome, resultado
+
+
+if __name__ == "__main__":
+    buf = []
+    buf.append("=" * 90)
+    buf.append(" OTIMIZAÇÃO DE CIRURGIAS ONCOLÓGICAS - MÉTODO SIMPLEX (PuLP) ")
+    buf.append("=" * 90)
+
+    buf.append("\n📊 PROCEDIMENTOS ONCOLÓGICOS:")
+    buf.append(pd.DataFrame(data).to_string(index=False))
+    emitir(buf)
+
+    buf = []
+    buf.append("\n" + "=" * 90)
+    buf.append(" RESULTADOS ")
+    buf.append("=" * 90)
+
+    # Execução serial: cada cenário leva milissegundos, menos que iniciar
+    # processos, e o cache de otimizar_cirurgias_pulp fica no mesmo processo
+    resultados = [_resolver_cenario(item) for item in cenarios.items()]
+
+    for nome, resultado in resultados:
+        buf.append(f"\n🏥 CENÁRIO {nome}")
+        buf.extend(resultado.saida)
+    emitir(buf)
+
+    solvers = " / ".join(sorted({resultado.solver for _, resultado in resultados}))
 
-print("\n" + "=" * 90)
-print("CONCLUSÃO")
-print("=" * 90)
-print("""
-✅ Solução ÓTIMA garantida pelo algoritmo Simplex (via PuLP + CBC)
+    buf = []
+    buf.append("\n" + "=" * 90)
+    buf.append("CONCLUSÃO")
+    buf.append("=" * 90)
+    buf.append(f"""
+✅ Solução ÓTIMA garantida pelo algoritmo Simplex (via {solvers})
 
 Este código garante:
 1. Solução matematicamente ótima (não heurística)
@@ -177,3 +323,4 @@ Para problemas maiores (100+ procedimentos), considerar:
 - Decomposição do problema (Dantzig-Wolfe)
 - Programação Estocástica (incerteza nos parâmetros)
 """)
+    emitir(buf)
@@ -13,14 +13,26 @@ METODOLOGIA: Programação Linear Inteira (Método Simplex)
 import pandas as pd
 import numpy as np
 
-print("=" * 90)
-print(" SISTEMA DE OTIMIZAÇÃO DE CIRURGIAS ONCOLÓGICAS - SIMPLEX ")
-print(" Baseado no Dataset Onco-360 e Metodologia do Trabalho Acadêmico ")
-print("=" * 90)
+from nucleo_guloso import calcular_pesos, como_arrays, emitir
 
+try:
+    from numba import njit
+except ImportError:  # numba é opcional: sem ele o núcleo roda em Python puro
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
 
-print("\n📊 DADOS DOS PROCEDIMENTOS ONCOLÓGICOS")
-print("=" * 90)
+
+buf = []
+buf.append("=" * 90)
+buf.append(" SISTEMA DE OTIMIZAÇÃO DE CIRURGIAS ONCOLÓGICAS - SIMPLEX ")
+buf.append(" Baseado no Dataset Onco-360 e Metodologia do Trabalho Acadêmico ")
+buf.append("=" * 90)
+
+
+buf.append("\n📊 DADOS DOS PROCEDIMENTOS ONCOLÓGICOS")
+buf.append("=" * 90)
 
 # Baseado em dados reais do SIH/SUS e literaturaonco médica
 procedimentos = {
@@ -52,19 +64,21 @@ procedimentos = {
     'incidencia_pe': [3.62, 10.01, 13.71, 7.36, 3.09, 5.20, 4.80, 6.15]
 }
 
-df = pd.DataFrame(procedimentos)
-print(df.to_string(index=False))
-print("=" * 90)
+data = como_arrays(procedimentos)
+buf.append(pd.DataFrame(data).to_string(index=False))
+buf.append("=" * 90)
+emitir(buf)
 
 # ============================================================================
 # FORMULAÇÃO MATEMÁTICA DO PROBLEMA
 # ============================================================================
 
-print("\n" + "=" * 90)
-print(" FORMULAÇÃO MATEMÁTICA (Programação Linear Inteira) ")
-print("=" * 90)
+buf = []
+buf.append("\n" + "=" * 90)
+buf.append(" FORMULAÇÃO MATEMÁTICA (Programação Linear Inteira) ")
+buf.append("=" * 90)
 
-print("""
+buf.append("""
 📐 MODELO MATEMÁTICO:
 
 Variáveis de Decisão:
@@ -97,14 +111,16 @@ O Método Simplex padrão resolve problemas com variáveis contínuas.
 Para variáveis inteiras, usamos Branch and Bound sobre o Simplex.
 """)
 
-print("=" * 90)
+buf.append("=" * 90)
+emitir(buf)
 
 # ============================================================================
 # CENÁRIOS DE RECURSOS DISPONÍVEIS
 # ============================================================================
 
-print("\n📋 CENÁRIOS DE RECURSOS DO SISTEMA DE SAÚDE")
-print("=" * 90)
+buf = []
+buf.append("\n📋 CENÁRIOS DE RECURSOS DO SISTEMA DE SAÚDE")
+buf.append("=" * 90)
 
 cenarios = {
     '1_REAL': {
@@ -131,19 +147,29 @@ cenarios = {
 }
 
 for key, cen in cenarios.items():
-    print(f"\n{cen['nome']}:")
-    print(f"  • Orçamento Mensal: R$ {cen['orcamento']:,.2f}")
-    print(f"  • Horas de Sala: {cen['horas_sala']}h")
-    print(f"  • Leitos de UTI: {cen['leitos_uti']}")
-    print(f"  • Prioridade: {cen['prioridade'].title()}")
+    buf.append(f"\n{cen['nome']}:")
+    buf.append(f"  • Orçamento Mensal: R$ {cen['orcamento']:,.2f}")
+    buf.append(f"  • Horas de Sala: {cen['horas_sala']}h")
+    buf.append(f"  • Leitos de UTI: {cen['leitos_uti']}")
+    buf.append(f"  • Prioridade: {cen['prioridade'].title()}")
 
-print("\n" + "=" * 90)
+buf.append("\n" + "=" * 90)
+emitir(buf)
 
 # ============================================================================
 # ALGORITMO SIMPLEX (Implementação Simplificada via Heurística Gulosa)
 # ============================================================================
 
-def resolver_simplex_guloso(df, orcamento, horas_sala, leitos_uti, criterio='gravidade'):
+# Núcleo numérico: extensão pré-compilada (python build_aot.py) quando
+# existir; caso contrário, compilado pelo Numba na primeira chamada
+try:
+    from onco_fast import greedy_core as _greedy_core
+except ImportError:
+    from nucleo_guloso import greedy_core
+    _greedy_core = njit(cache=True)(greedy_core)
+
+
+def resolver_simplex_guloso(data, orcamento, horas_sala, leitos_uti, criterio='gravidade'):
     """
     Resolve o problema de otimização usando heurística gulosa
     (aproximação do Simplex para demonstração didática)
@@ -151,111 +177,102 @@ def resolver_simplex_guloso(df, orcamento, horas_sala, leitos_uti, criterio='gra
     NOTA: Em produção, usar biblioteca PuLP com solver CBC para solução ótima
     """
     
-    # Definir pesos baseado no critério
-    if criterio == 'gravidade':
-        df['peso'] = df['gravidade']
-    elif criterio == 'incidencia':
-        df['peso'] = df['incidencia_pe']
-    else:  # custo-beneficio
-        df['peso'] = df['gravidade'] / df['custo_r'] * 10000
+    # Definir pesos baseado no critério (data não é modificado)
+    pesos = calcular_pesos(data, criterio)
     
-    # Ordenar por peso (maior primeiro)
-    df_sorted = df.sort_values('peso', ascending=False).reset_index(drop=True)
+    # Colunas convertidas para arrays NumPy (nada de pandas dentro do laço)
+    custos = data['custo_r'].astype(np.float64)
+    tempos = data['tempo_h'].astype(np.float64)
+    utis = data['uti'].astype(np.float64)
     
-    # Inicializar solução
-    solucao = []
-    orcamento_usado = 0
-    tempo_usado = 0
-    uti_usada = 0
-    valor_objetivo = 0
+    # Ordenar por peso (maior primeiro)
+    ordem = np.argsort(-pesos, kind='stable')
     
     # Algoritmo guloso (escolhe procedimentos de maior peso que cabem nos recursos)
-    for idx, proc in df_sorted.iterrows():
-        # Calcular quantos deste procedimento cabem nos recursos disponíveis
-        max_por_orcamento = (orcamento - orcamento_usado) // proc['custo_r']
-        max_por_tempo = (horas_sala - tempo_usado) / proc['tempo_h']
-        max_por_uti = (leitos_uti - uti_usada) // proc['uti'] if proc['uti'] > 0 else float('inf')
-        
-        # Quantidade máxima que pode ser feita
-        qtd_max = int(min(max_por_orcamento, max_por_tempo, max_por_uti))
-        
-        if qtd_max > 0:
-            # Adicionar à solução
-            solucao.append({
-                'ID': proc['id'],
-                'Procedimento': proc['procedimento'],
-                'Quantidade': qtd_max,
-                'Gravidade': proc['gravidade'],
-                'Tempo_Total_h': qtd_max * proc['tempo_h'],
-                'Custo_Total_R$': qtd_max * proc['custo_r'],
-                'Leitos_UTI': qtd_max * proc['uti'],
-                'Peso': proc['peso']
-            })
-            
-            # Atualizar recursos usados
-            orcamento_usado += qtd_max * proc['custo_r']
-            tempo_usado += qtd_max * proc['tempo_h']
-            uti_usada += qtd_max * proc['uti']
-            valor_objetivo += qtd_max * proc['peso']
+    pos, quantidades = _greedy_core(
+        custos[ordem], tempos[ordem], utis[ordem],
+        float(orcamento), float(horas_sala), float(leitos_uti)
+    )
+    indices = ordem[pos]
     
-    return solucao, {
-        'valor_objetivo': valor_objetivo,
-        'orcamento_usado': orcamento_usado,
-        'tempo_usado': tempo_usado,
-        'uti_usada': uti_usada,
-        'total_cirurgias': sum([s['Quantidade'] for s in solucao])
+    custo_total = quantidades * data['custo_r'][indices]
+    tempo_total = quantidades * data['tempo_h'][indices]
+    uti_total = quantidades * data['uti'][indices]
+    metricas = {
+        'valor_objetivo': (quantidades * pesos[indices]).sum(),
+        'orcamento_usado': custo_total.sum(),
+        'tempo_usado': tempo_total.sum(),
+        'uti_usada': uti_total.sum(),
+        'total_cirurgias': int(quantidades.sum())
     }
+    
+    solucao = pd.DataFrame({
+        'ID': data['id'][indices],
+        'Procedimento': data['procedimento'][indices],
+        'Quantidade': quantidades,
+        'Gravidade': data['gravidade'][indices],
+        'Tempo_Total_h': tempo_total,
+        'Custo_Total_R$': custo_total,
+        'Leitos_UTI': uti_total,
+        'Peso': pesos[indices]
+    })
+    
+    return solucao, metricas
 
 # ============================================================================
 # RESOLVER PARA TODOS OS CENÁRIOS
 # ============================================================================
 
-print("\n" + "=" * 90)
-print(" RESULTADOS DA OTIMIZAÇÃO - MÉTODO SIMPLEX ")
-print("=" * 90)
+buf = []
+buf.append("\n" + "=" * 90)
+buf.append(" RESULTADOS DA OTIMIZAÇÃO - MÉTODO SIMPLEX ")
+buf.append("=" * 90)
 
 resultados_todos = {}
 
 for key, cen in cenarios.items():
-    print(f"\n{'=' * 90}")
-    print(f"🏥 {cen['nome']}")
-    print(f"{'=' * 90}")
+    buf.append(f"\n{'=' * 90}")
+    buf.append(f"🏥 {cen['nome']}")
+    buf.append(f"{'=' * 90}")
     
     solucao, metricas = resolver_simplex_guloso(
-        df.copy(),
+        data,
         cen['orcamento'],
         cen['horas_sala'],
         cen['leitos_uti'],
         cen['prioridade']
     )
     
-    if solucao:
-        df_sol = pd.DataFrame(solucao)
-        print("\n📊 PLANO ÓTIMO DE CIRURGIAS:")
-        print("-" * 90)
-        print(df_sol[['ID', 'Procedimento', 'Quantidade', 'Gravidade', 
+    if not solucao.empty:
+        df_sol = solucao
+        buf.append("\n📊 PLANO ÓTIMO DE CIRURGIAS:")
+        buf.append("-" * 90)
+        buf.append(df_sol[['ID', 'Procedimento', 'Quantidade', 'Gravidade', 
                       'Tempo_Total_h', 'Custo_Total_R$', 'Leitos_UTI']].to_string(index=False))
-        print("-" * 90)
+        buf.append("-" * 90)
         
-        print(f"\n📈 RESUMO:")
-        print(f"  • Total de Cirurgias: {metricas['total_cirurgias']}")
-        print(f"  • Tempo Usado: {metricas['tempo_usado']:.1f}h / {cen['horas_sala']}h ({metricas['tempo_usado']/cen['horas_sala']*100:.1f}%)")
-        print(f"  • Orçamento Usado: R$ {metricas['orcamento_usado']:,.2f} / R$ {cen['orcamento']:,.2f} ({metricas['orcamento_usado']/cen['orcamento']*100:.1f}%)")
-        print(f"  • Leitos UTI Usados: {metricas['uti_usada']} / {cen['leitos_uti']} ({metricas['uti_usada']/cen['leitos_uti']*100:.1f}%)")
-        print(f"  • Valor da Função Objetivo: {metricas['valor_objetivo']:.2f}")
+        buf.append(f"\n📈 RESUMO:")
+        buf.append(f"  • Total de Cirurgias: {metricas['total_cirurgias']}")
+        buf.append(f"  • Tempo Usado: {metricas['tempo_usado']:.1f}h / {cen['horas_sala']}h ({metricas['tempo_usado']/cen['horas_sala']*100:.1f}%)")
+        buf.append(f"  • Orçamento Usado: R$ {metricas['orcamento_usado']:,.2f} / R$ {cen['orcamento']:,.2f} ({metricas['orcamento_usado']/cen['orcamento']*100:.1f}%)")
+        buf.append(f"  • Leitos UTI Usados: {metricas['uti_usada']} / {cen['leitos_uti']} ({metricas['uti_usada']/cen['leitos_uti']*100:.1f}%)")
+        buf.append(f"  • Valor da Função Objetivo: {metricas['valor_objetivo']:.2f}")
         
         resultados_todos[key] = {'solucao': df_sol, 'metricas': metricas}
     else:
-        print("\n❌ Nenhuma solução viável encontrada (recursos insuficientes)")
+        buf.append("\n❌ Nenhuma solução viável encontrada (recursos insuficientes)")
         resultados_todos[key] = {'solucao': None, 'metricas': None}
 
+emitir(buf)
+
 # ============================================================================
 # COMPARAÇÃO ENTRE CENÁRIOS
 # ============================================================================
 
-print("\n\n" + "=" * 90)
-print(" ANÁLISE COMPARATIVA ENTRE CENÁRIOS ")
-print("=" * 90)
+buf = []
+buf.append("\n\n" + "=" * 90)
+buf.append(" ANÁLISE COMPARATIVA ENTRE CENÁRIOS ")
+buf.append("=" * 90)
 
 comparacao = []
 for key, resultado in resultados_todos.items():
@@ -270,45 +287,59 @@ for key, resultado in resultados_todos.items():
         })
 
 df_comp = pd.DataFrame(comparacao)
-print("\n" + df_comp.to_string(index=False))
+buf.append("\n" + df_comp.to_string(index=False))
+emitir(buf)
 
 # ============================================================================
 # ANÁLISE DE SENSIBILIDADE
 # ============================================================================
 
-print("\n\n" + "=" * 90)
-print(" ANÁLISE DE SENSIBILIDADE - VARIAÇÃO DE ORÇAMENTO ")
-print("=" * 90)
+buf = []
+buf.append("\n\n" + "=" * 90)
+buf.append(" ANÁLISE DE SENSIBILIDADE - VARIAÇÃO DE ORÇAMENTO ")
+buf.append("=" * 90)
 
-print("\n🔬 Testando impacto da variação de ±20% no orçamento...")
+buf.append("\n🔬 Testando impacto da variação de ±20% no orçamento...")
 
 base = cenarios['1_REAL']
 variacoes = [0.8, 0.9, 1.0, 1.1, 1.2]
 
-print("\n| Variação | Orçamento (R$) | Cirurgias | Valor Obj |")
-print("|----------|----------------|-----------|-----------|")
+buf.append("\n| Variação | Orçamento (R$) | Cirurgias | Valor Obj |")
+buf.append("|----------|----------------|-----------|-----------|")
+
+# Apenas o orçamento varia: pesos, ordenação e arrays são calculados uma vez
+w = calcular_pesos(data, base['prioridade'])
+ordem = np.argsort(-w, kind='stable')
+w = w[ordem]
+c = data['custo_r'].astype(np.float64)[ordem]
+t = data['tempo_h'].astype(np.float64)[ordem]
+u = data['uti'].astype(np.float64)[ordem]
 
 for var in variacoes:
     orc_teste = int(base['orcamento'] * var)
-    _, metricas = resolver_simplex_guloso(
-        df.copy(),
-        orc_teste,
-        base['horas_sala'],
-        base['leitos_uti'],
-        base['prioridade']
+    pos, qtd = _greedy_core(
+        c, t, u,
+        float(orc_teste),
+        float(base['horas_sala']),
+        float(base['leitos_uti'])
     )
+    total_cirurgias = qtd.sum()
+    valor_objetivo = (qtd * w[pos]).sum()
     
-    print(f"| {int(var*100):>3}%     | {orc_teste:>14,} | {metricas['total_cirurgias']:>9} | {metricas['valor_objetivo']:>9.1f} |")
+    buf.append(f"| {int(var*100):>3}%     | {orc_teste:>14,} | {total_cirurgias:>9} | {valor_objetivo:>9.1f} |")
+
+emitir(buf)
 
 # ============================================================================
 # EXEMPLO DIDÁTICO (Conforme Questão 3 do PDF)
 # ============================================================================
 
-print("\n\n" + "=" * 90)
-print(" EXEMPLO DIDÁTICO - CASO SIMPLIFICADO ")
-print("=" * 90)
+buf = []
+buf.append("\n\n" + "=" * 90)
+buf.append(" EXEMPLO DIDÁTICO - CASO SIMPLIFICADO ")
+buf.append("=" * 90)
 
-print("""
+buf.append("""
 📚 CENÁRIO FICTÍCIO (similar ao exercício do trabalho):
 
 Local: Bloco Cirúrgico do PROCAPE
@@ -353,16 +384,18 @@ mais crítico, garantindo o recurso escasso (UTI) para quem mais precisa.
 Este exemplo demonstra como a Programação Linear Inteira via Simplex
 pode otimizar decisões complexas em ambientes com recursos limitados.
 """)
+emitir(buf)
 
 # ============================================================================
 # CONCLUSÕES E RECOMENDAÇÕES
 # ============================================================================
 
-print("\n" + "=" * 90)
-print(" CONCLUSÕES E RECOMENDAÇÕES ")
-print("=" * 90)
+buf = []
+buf.append("\n" + "=" * 90)
+buf.append(" CONCLUSÕES E RECOMENDAÇÕES ")
+buf.append("=" * 90)
 
-print("""
+buf.append("""
 🎯 PRINCIPAIS ACHADOS:
 
 1. GARGALO CRÍTICO:
@@ -423,6 +456,7 @@ otimização matemática para decisões de gestão em saúde pública.
     resultados_todos['3_PESSIMISTA']['metricas']['total_cirurgias'] if resultados_todos['3_PESSIMISTA']['metricas'] else '?'
 ))
 
-print("\n" + "=" * 90)
-print(" OTIMIZAÇÃO CONCLUÍDA! ")
-print("=" * 90)
+buf.append("\n" + "=" * 90)
+buf.append(" OTIMIZAÇÃO CONCLUÍDA! ")
+buf.append("=" * 90)
+emitir(buf)